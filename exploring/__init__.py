@@ -1 +1 @@
-from .models import Bot
+from .models import Bot, BotArray
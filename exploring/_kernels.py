@@ -0,0 +1,160 @@
+from typing import Tuple
+
+import numpy as np
+
+from utils import njit
+
+
+# Типы событий, записываемых ядром в буфер событий
+
+EVENT_EXPLORED = 0
+EVENT_MOVE = 1
+EVENT_PROCRASTINATED = 2
+EVENT_WOKEN = 3
+
+# Максимальное количество событий на одного бота за шаг:
+# исследование текущей клетки, 4 найденные клетки и пробуждение
+
+EVENTS_PER_BOT = 6
+
+
+@njit(cache=True)
+def step_kernel(flat_matrix: np.ndarray,
+                width: int,
+                positions: np.ndarray,
+                statuses: np.ndarray,
+                directions: np.ndarray,
+                events: np.ndarray,
+                task_arr: np.ndarray,
+                task_head: int,
+                task_tail: int,
+                unexplored_block: int,
+                procrastinated_block: int,
+                explored_block: int,
+                bot_block: int,
+                active_status: int,
+                waiting_status: int) -> Tuple[int, int, int]:
+    """
+    Шаг исследования лабиринта
+
+    1) Активные боты обрабатываются по очереди: каждый бот помечает текущую клетку исследованной,
+        переходит в первую неисследованную соседнюю клетку, а остальные неисследованные
+        соседние клетки откладывает. Бот без хода переходит в режим ожидания.
+    2) Ожидающие боты по очереди забирают отложенные задачи из начала очереди.
+
+    Parameters
+    ----------
+    flat_matrix : np.ndarray
+        Матрица лабиринта, развернутая в одномерный массив, изменяется на месте.
+        Клетке (y, x) соответствует индекс y * width + x
+    width : int
+        Ширина лабиринта
+    positions : np.ndarray
+        Координаты ботов, массив формы (N, 2), изменяется на месте
+    statuses : np.ndarray
+        Статусы ботов, массив формы (N,), изменяется на месте
+    directions : np.ndarray
+        Смещения соседних клеток в порядке приоритета, массив формы (4, 2)
+    events : np.ndarray
+        Буфер событий, массив формы (EVENTS_PER_BOT * N, 5).
+        Строка события: (height, width) бота, (height, width) клетки, тип события
+    task_arr : np.ndarray
+        Очередь отложенных задач, массив формы (H * W, 2)
+    task_head : int
+        Индекс начала очереди отложенных задач
+    task_tail : int
+        Индекс конца очереди отложенных задач
+    unexplored_block : int
+        Тип неисследованного блока
+    procrastinated_block : int
+        Тип отложенного блока
+    explored_block : int
+        Тип исследованного блока
+    bot_block : int
+        Тип блока, занятого ботом
+    active_status : int
+        Статус активного бота
+    waiting_status : int
+        Статус ожидающего бота
+
+    Returns
+    -------
+    event_num : int
+        Количество записанных в буфер событий
+    task_head : int
+        Новый индекс начала очереди отложенных задач
+    task_tail : int
+        Новый индекс конца очереди отложенных задач
+    """
+    offsets = directions[:, 0] * width + directions[:, 1]
+    event_num = 0
+
+    # Работа с активными ботами
+
+    for bot_idx in range(positions.shape[0]):
+        if statuses[bot_idx] != active_status:
+            continue
+        bot_y = positions[bot_idx, 0]
+        bot_x = positions[bot_idx, 1]
+        bot_cell = bot_y * width + bot_x
+        flat_matrix[bot_cell] = explored_block
+        events[event_num, 0] = bot_y
+        events[event_num, 1] = bot_x
+        events[event_num, 2] = bot_y
+        events[event_num, 3] = bot_x
+        events[event_num, 4] = EVENT_EXPLORED
+        event_num += 1
+        got_task = False
+
+        for direction_idx in range(directions.shape[0]):
+            cell = bot_cell + offsets[direction_idx]
+            if flat_matrix[cell] != unexplored_block:
+                continue
+            cell_y = bot_y + directions[direction_idx, 0]
+            cell_x = bot_x + directions[direction_idx, 1]
+
+            events[event_num, 0] = bot_y
+            events[event_num, 1] = bot_x
+            events[event_num, 2] = cell_y
+            events[event_num, 3] = cell_x
+            if not got_task:
+                got_task = True
+                events[event_num, 4] = EVENT_MOVE
+                positions[bot_idx, 0] = cell_y
+                positions[bot_idx, 1] = cell_x
+                flat_matrix[cell] = bot_block
+            else:
+                events[event_num, 4] = EVENT_PROCRASTINATED
+                flat_matrix[cell] = procrastinated_block
+                task_arr[task_tail, 0] = cell_y
+                task_arr[task_tail, 1] = cell_x
+                task_tail += 1
+            event_num += 1
+
+        if not got_task:
+            statuses[bot_idx] = waiting_status
+            positions[bot_idx, 0] = -1
+            positions[bot_idx, 1] = -1
+
+    # Работа со спящими ботами
+
+    for bot_idx in range(positions.shape[0]):
+        if task_head == task_tail:
+            break
+        if statuses[bot_idx] != waiting_status:
+            continue
+        cell_y = task_arr[task_head, 0]
+        cell_x = task_arr[task_head, 1]
+        task_head += 1
+        statuses[bot_idx] = active_status
+        positions[bot_idx, 0] = cell_y
+        positions[bot_idx, 1] = cell_x
+        flat_matrix[cell_y * width + cell_x] = bot_block
+        events[event_num, 0] = cell_y
+        events[event_num, 1] = cell_x
+        events[event_num, 2] = cell_y
+        events[event_num, 3] = cell_x
+        events[event_num, 4] = EVENT_WOKEN
+        event_num += 1
+
+    return event_num, task_head, task_tail
@@ -1,21 +1,27 @@
+from dataclasses import dataclass, field
+from itertools import count
 from typing import Tuple, Optional
-from time import time, sleep
 from warnings import warn
 
+import numpy as np
+
 
 class Bot(object):
     """
     Класс для описания бота
     """
+    __slots__ = ('__status', '__position', '__name')
+
     ACTIVE_STATUS: int = 1
     WAITING_STATUS: int = 0
 
+    _id_counter = count()
+
     def __init__(self, name: str = None):
         self.__status: int = Bot.WAITING_STATUS
         self.__position: Tuple[Optional[int], Optional[int]] = (None, None)
         if name is None:
-            sleep(0.01)
-            self.__name: str = 'BOT_{id}'.format(id=str(time()))
+            self.__name: str = 'BOT_{id}'.format(id=next(Bot._id_counter))
         else:
             self.__name: str = name
 
@@ -41,7 +47,7 @@ class Bot(object):
         position : tuple of int
             Координаты бота (height, width)
         """
-        return tuple(self.__position)
+        return self.__position
 
     @property
     def name(self) -> str:
@@ -78,29 +84,82 @@ class Bot(object):
         self.__status = Bot.WAITING_STATUS
         self.__position = (None, None)
 
+    def move(self, dy: int, dx: int) -> None:
+        """
+        Метод для перемещения бота на заданное смещение
+
+        Parameters
+        ----------
+        dy : int
+            Смещение по вертикали
+        dx : int
+            Смещение по горизонтали
+        """
+        position = self.__position
+        self.__position = (position[0] + dy, position[1] + dx)
+
     def move_up(self) -> None:
         """
         Метод для перемещения бота на 1 клетку вверх
         """
-        self.__position = (self.__position[0] - 1, self.__position[1])
+        self.move(-1, 0)
 
     def move_down(self) -> None:
         """
         Метод для перемещения бота на 1 клетку вниз
         """
-        self.__position = (self.__position[0] + 1, self.__position[1])
+        self.move(1, 0)
 
     def move_left(self) -> None:
         """
         Метод для перемещения бота на 1 клетку влево
         """
-        self.__position = (self.__position[0], self.__position[1] - 1)
+        self.move(0, -1)
 
     def move_right(self) -> None:
         """
         Метод для перемещения бота на 1 клетку вправо
         """
-        self.__position = (self.__position[0], self.__position[1] + 1)
+        self.move(0, 1)
+
+
+@dataclass
+class BotArray(object):
+    """
+    Класс для описания группы ботов в виде набора массивов (structure of arrays)
+
+    Attributes
+    ----------
+    bot_number : int
+        Количество ботов
+    positions : np.ndarray
+        Координаты ботов (height, width), массив формы (N, 2)
+    status : np.ndarray
+        Статусы ботов, массив формы (N,)
+    """
+    bot_number: int
+    positions: np.ndarray = field(init=False)
+    status: np.ndarray = field(init=False)
+
+    def __post_init__(self):
+        self.positions = np.full((self.bot_number, 2), -1, dtype=np.int32)
+        self.status = np.full(self.bot_number, Bot.WAITING_STATUS, dtype=np.uint8)
+
+    def activate(self, idx, drop_positions) -> None:
+        """
+        Метод для активации ботов
+
+        Parameters
+        ----------
+        idx : int or np.ndarray
+            Индексы активируемых ботов
+        drop_positions : tuple of int or np.ndarray
+            Координаты точек, в которых боты начинают исследование
+        """
+        if np.any(self.status[idx] == Bot.ACTIVE_STATUS):
+            warn('Попытка перевести активного бота в активное состояние.')
+        self.status[idx] = Bot.ACTIVE_STATUS
+        self.positions[idx] = drop_positions
 
 
 if __name__ == '__main__':
@@ -1,16 +1,16 @@
 import sys
 from time import sleep
 from tkinter import filedialog
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, Tuple
 from warnings import warn
 
 import matplotlib.pyplot as plt
 import networkx as nx
 import numpy as np
-import pandas as pd
 from PyQt5 import QtWidgets
 
 from exploring import *
+from exploring._kernels import step_kernel, EVENTS_PER_BOT, EVENT_EXPLORED, EVENT_MOVE, EVENT_WOKEN
 from gui.models import MainWindow
 from maze import *
 
@@ -30,17 +30,39 @@ class ExploreManager(object):
     EXPLORED_COLOR_G = (0.35, 0.63, 0.35)
     BOT_COLOR_G = (0.99, 0.1, 0.1)
 
+    # Палитра для отрисовки лабиринта, индексируется типом блока.
+    # WALL_BLOCK = -1 попадает на последнюю строку палитры
+    PALETTE = np.empty((5, 3), dtype=np.uint8)
+    PALETTE[Maze.WALL_BLOCK] = WALL_COLOR
+    PALETTE[Maze.UNEXPLORED_BLOCK] = UNEXPLORED_COLOR
+    PALETTE[Maze.PROCRASTINATED_BLOCK] = PROCRASTINATED_COLOR
+    PALETTE[Maze.EXPLORED_BLOCK] = EXPLORED_COLOR
+    PALETTE[Maze.BOT_BLOCK] = BOT_COLOR
+
+    # Смещения соседних клеток в порядке приоритета: вверх, вниз, влево, вправо
+    DIRECTIONS = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)], dtype=np.int32)
+
     def __init__(self):
         self.maze: Optional[Maze] = None
-        self.bot_list: Optional[List[Bot]] = None
-        self.task_list: Optional[List[Tuple[int, int]]] = None
+        self.bots: Optional[BotArray] = None
+        self.task_arr: Optional[np.ndarray] = None
+        self.task_head: int = 0
+        self.task_tail: int = 0
         self.graph: Optional[nx.Graph] = None
         self.ready: bool = False
         plt.ion()
         self.matrix_img = None
-        self.graph_colormap: Optional[pd.DataFrame] = None
+        self.node_color: Optional[Dict[Tuple[int, int], Tuple[float, float, float]]] = None
         self.graph_ax = None
         self.step = 0
+        self._events: Optional[np.ndarray] = None
+        self._layout: Dict[Tuple[int, int], np.ndarray] = {}
+        self._layout_stale: bool = True
+        self._render_buf: Optional[np.ndarray] = None
+        self._fig = None
+        self._background = None
+        self._graph_nodes = None
+        self._graph_labels: list = []
 
     def update_data(self,
                     new_bot_num: int,
@@ -79,33 +101,89 @@ class ExploreManager(object):
         hard : bool
             Если True то график будет полностью сброшен перед отображением
         """
-        show_matrix = np.zeros(self.maze.matrix.shape + tuple([3]))
-        for height_idx in range(self.maze.height):
-            for width_idx in range(self.maze.width):
-                if self.maze.matrix[height_idx, width_idx] == Maze.WALL_BLOCK:
-                    show_matrix[height_idx, width_idx, :] = ExploreManager.WALL_COLOR
-                elif self.maze.matrix[height_idx, width_idx] == Maze.UNEXPLORED_BLOCK:
-                    show_matrix[height_idx, width_idx, :] = ExploreManager.UNEXPLORED_COLOR
-                elif self.maze.matrix[height_idx, width_idx] == Maze.EXPLORED_BLOCK:
-                    show_matrix[height_idx, width_idx, :] = ExploreManager.EXPLORED_COLOR
-                elif self.maze.matrix[height_idx, width_idx] == Maze.PROCRASTINATED_BLOCK:
-                    show_matrix[height_idx, width_idx, :] = ExploreManager.PROCRASTINATED_COLOR
-                else:
-                    show_matrix[height_idx, width_idx, :] = ExploreManager.BOT_COLOR
+        # Перекрашивается только область лабиринта, измененная с прошлой отрисовки
+
+        if self.matrix_img is None or hard:
+            np.take(ExploreManager.PALETTE, self.maze.matrix, axis=0, out=self._render_buf)
+        elif self.maze.dirty_region is not None:
+            y_start, y_stop, x_start, x_stop = self.maze.dirty_region
+            np.take(ExploreManager.PALETTE, self.maze.matrix[y_start:y_stop, x_start:x_stop], axis=0,
+                    out=self._render_buf[y_start:y_stop, x_start:x_stop])
+        self.maze.clear_dirty()
+        show_matrix = self._render_buf
 
         if self.matrix_img is None or hard:
             if self.matrix_img is not None:
                 plt.close()
-            fig, (matrix_ax, self.graph_ax) = plt.subplots(ncols=2, figsize=(5, 5))
-            fig.set_size_inches(10, 5)
+            self._fig, (matrix_ax, self.graph_ax) = plt.subplots(ncols=2, figsize=(5, 5))
+            self._fig.set_size_inches(10, 5)
+            self._fig.canvas.mpl_connect('draw_event', self._on_draw)
 
-            self.matrix_img = matrix_ax.imshow(show_matrix.astype(np.uint8))
+            self.matrix_img = matrix_ax.imshow(show_matrix, animated=True)
+            self._graph_nodes = None
         else:
-            self.matrix_img.set_data(show_matrix.astype(np.uint8))
+            self.matrix_img.set_data(show_matrix)
+
+        node_color = [self.node_color[node] for node in self.graph.nodes]
+        canvas = self._fig.canvas
+
+        # Раскладка графа пересчитывается только после добавления новых вершин,
+        # в остальных случаях перекрашиваются вершины и перерисовываются только
+        # изменяемые элементы поверх сохраненного фона
+
+        if self._layout_stale or self._graph_nodes is None:
+            if self._layout_stale:
+                self._layout = nx.kamada_kawai_layout(self.graph)
+                self._layout_stale = False
             self.graph_ax.clear()
-        nx.draw_kamada_kawai(self.graph, ax=self.graph_ax, with_labels=True, node_color=self.graph_colormap['color'])
-        plt.draw()
-        plt.pause(0.01)
+            nx.draw_networkx_edges(self.graph, pos=self._layout, ax=self.graph_ax)
+            self._graph_nodes = nx.draw_networkx_nodes(self.graph, pos=self._layout, ax=self.graph_ax,
+                                                       node_color=node_color)
+            self._graph_labels = list(nx.draw_networkx_labels(self.graph, pos=self._layout,
+                                                              ax=self.graph_ax).values())
+            self.graph_ax.set_axis_off()
+            for artist in self._animated_artists():
+                artist.set_animated(True)
+            canvas.draw()
+            canvas.blit(self._fig.bbox)
+        else:
+            self._graph_nodes.set_facecolor(node_color)
+            canvas.restore_region(self._background)
+            self._draw_animated()
+            canvas.blit(self.matrix_img.axes.bbox)
+            canvas.blit(self.graph_ax.bbox)
+        canvas.flush_events()
+
+    def _animated_artists(self) -> list:
+        """
+        Метод для получения элементов графика, которые меняются между шагами
+
+        Returns
+        -------
+        artists : list
+            Изображение лабиринта, вершины графа и их подписи
+        """
+        return [self.matrix_img, self._graph_nodes] + self._graph_labels
+
+    def _draw_animated(self):
+        """
+        Метод для отрисовки изменяемых элементов графика
+        """
+        for artist in self._animated_artists():
+            self._fig.draw_artist(artist)
+
+    def _on_draw(self, event):
+        """
+        Обработчик полной перерисовки окна: сохраняет фон для последующих обновлений
+
+        Parameters
+        ----------
+        event : DrawEvent
+            Событие перерисовки
+        """
+        self._background = self._fig.canvas.copy_from_bbox(self._fig.bbox)
+        if self._graph_nodes is not None:
+            self._draw_animated()
 
     def setup_simulation(self,
                          manual_matrix: np.ndarray = None,
@@ -131,7 +209,7 @@ class ExploreManager(object):
         # Создание лабиринта
 
         self.maze = Maze()
-        if type(manual_matrix) == np.ndarray:
+        if isinstance(manual_matrix, np.ndarray):
             self.maze.set_matrix_manually(manual_matrix)
         else:
             self.maze.set_matrix_randomly(height=height, width=width)
@@ -141,47 +219,47 @@ class ExploreManager(object):
         if bot_number < 1:
             warn('Количество ботов не может быть меньше 1. Будет использовано значение по умолчанию')
             bot_number: int = 5
-        self.bot_list = [Bot(str(number)) for number in range(bot_number)]
+        self.bots = BotArray(bot_number)
+
+        # Создание очереди для хранения отложенных задач.
+        # Каждая клетка откладывается не более одного раза, поэтому размера H*W достаточно
+
+        self.task_arr = np.empty((self.maze.height * self.maze.width, 2), dtype=np.int32)
+        self.task_head = self.task_tail = 0
 
-        # Создание списка для хранения отложенных задач
+        # Буфер для событий, произошедших с ботами за один шаг
 
-        self.task_list = list()
+        self._events = np.empty((EVENTS_PER_BOT * bot_number, 5), dtype=np.int32)
+
+        # Буфер для отрисовки лабиринта, пересоздается только при изменении размера
+
+        if self._render_buf is None or self._render_buf.shape[:2] != self.maze.matrix.shape:
+            self._render_buf = np.empty(self.maze.matrix.shape + (3,), dtype=np.uint8)
 
         # Активация первого бота
 
+        start_y, start_x = starting_point
+        if not (0 <= start_y < self.maze.height and 0 <= start_x < self.maze.width) or \
+                self.maze.matrix[start_y, start_x] == Maze.WALL_BLOCK:
+            if self.maze.not_wall_count == 0:
+                raise ValueError('В лабиринте нет клеток, доступных для исследования')
+            start_y, start_x = np.argwhere(self.maze.matrix != Maze.WALL_BLOCK)[0].tolist()
+            warn('Начальная точка {point} является стеной или лежит вне лабиринта. '
+                 'Будет использована точка {new_point}'.format(point=starting_point, new_point=(start_y, start_x)))
+            starting_point = (start_y, start_x)
+
         self.maze.change_block(starting_point, Maze.BOT_BLOCK)
-        self.bot_list[0].activate(starting_point)
+        self.bots.activate(0, starting_point)
 
         self.graph = nx.Graph()
-        self.graph_colormap = pd.DataFrame(
-            {'id': [str((-1, -1)), str(starting_point)], 'color': [self.START_COLOR_G, self.BOT_COLOR_G]}).set_index(
-            'id')
+        self.node_color = {(-1, -1): self.START_COLOR_G, starting_point: self.BOT_COLOR_G}
         self.graph.add_edge((-1, -1), starting_point)
+        self._layout_stale = True
 
         self.step = 1
 
         self.ready = True
 
-    def get_active_bots(self) -> List[Bot]:
-        """
-            Метод для получения списка активных ботов
-        Returns
-        -------
-        active_bots
-            Список активных ботов
-        """
-        return list(filter(lambda bot: bot.status == Bot.ACTIVE_STATUS, self.bot_list))
-
-    def get_waiting_bots(self) -> List[Bot]:
-        """
-            Метод для получения ожидающих ботов
-        Returns
-        -------
-        waiting_bots
-            Список ожидающих ботов
-        """
-        return list(filter(lambda bot: bot.status == Bot.WAITING_STATUS, self.bot_list))
-
     def exploring_step(self):
         """
         Метод, выполняющий 1 шаг исследования лабиринта
@@ -191,84 +269,37 @@ class ExploreManager(object):
         2) Каждый спящий бот может активироваться для выполнения задач (если таковые имеются)
         """
 
-        # Работа с активными ботами
-
-        active_bots = self.get_active_bots()
-        for bot in active_bots:
-            bot_position = bot.position
-            self.maze.change_block(bot_position, Maze.EXPLORED_BLOCK)
-            self.graph_colormap.loc[str(bot_position), 'color'] = self.EXPLORED_COLOR_G
-            got_task: bool = False
-
-            if self.maze.matrix[bot_position[0] - 1, bot_position[1]] == Maze.UNEXPLORED_BLOCK:
-                got_task = True
-                bot.move_up()
-                self.maze.change_block((bot_position[0] - 1, bot_position[1]), Maze.BOT_BLOCK)
-                self.graph.add_edge(bot_position, bot.position)
-                new_node = pd.DataFrame([{'id': str(bot.position), 'color': self.BOT_COLOR_G}]).set_index('id')
-                self.graph_colormap = self.graph_colormap.append(new_node)
-
-            if self.maze.matrix[bot_position[0] + 1, bot_position[1]] == Maze.UNEXPLORED_BLOCK:
-                if not got_task:
-                    got_task = True
-                    bot.move_down()
-                    self.maze.change_block((bot_position[0] + 1, bot_position[1]), Maze.BOT_BLOCK)
-                    self.graph.add_edge(bot_position, bot.position)
-                    new_node = pd.DataFrame([{'id': str(bot.position), 'color': self.BOT_COLOR_G}]).set_index('id')
-                else:
-                    self.task_list.append((bot_position[0] + 1, bot_position[1]))
-                    self.maze.change_block((bot_position[0] + 1, bot_position[1]), Maze.PROCRASTINATED_BLOCK)
-                    self.graph.add_edge(bot_position, (bot_position[0] + 1, bot_position[1]))
-                    new_node = pd.DataFrame(
-                        [{'id': str((bot_position[0] + 1, bot_position[1])),
-                          'color': self.PROCRASTINATED_COLOR_G}]).set_index('id')
-                self.graph_colormap = self.graph_colormap.append(new_node)
-
-            if self.maze.matrix[bot_position[0], bot_position[1] - 1] == Maze.UNEXPLORED_BLOCK:
-                if not got_task:
-                    got_task = True
-                    bot.move_left()
-                    self.maze.change_block((bot_position[0], bot_position[1] - 1), Maze.BOT_BLOCK)
-                    self.graph.add_edge(bot_position, bot.position)
-                    new_node = pd.DataFrame([{'id': str(bot.position), 'color': self.BOT_COLOR_G}]).set_index('id')
-                else:
-                    self.task_list.append((bot_position[0], bot_position[1] - 1))
-                    self.maze.change_block((bot_position[0], bot_position[1] - 1), Maze.PROCRASTINATED_BLOCK)
-                    self.graph.add_edge(bot_position, (bot_position[0], bot_position[1] - 1))
-                    new_node = pd.DataFrame(
-                        [{'id': str((bot_position[0], bot_position[1] - 1)),
-                          'color': self.PROCRASTINATED_COLOR_G}]).set_index('id')
-                self.graph_colormap = self.graph_colormap.append(new_node)
-
-            if self.maze.matrix[bot_position[0], bot_position[1] + 1] == Maze.UNEXPLORED_BLOCK:
-                if not got_task:
-                    got_task = True
-                    bot.move_right()
-                    self.maze.change_block((bot_position[0], bot_position[1] + 1), Maze.BOT_BLOCK)
-                    self.graph.add_edge(bot_position, bot.position)
-                    new_node = pd.DataFrame([{'id': str(bot.position), 'color': self.BOT_COLOR_G}]).set_index('id')
-                else:
-                    self.task_list.append((bot_position[0], bot_position[1] + 1))
-                    self.maze.change_block((bot_position[0], bot_position[1] + 1), Maze.PROCRASTINATED_BLOCK)
-                    self.graph.add_edge(bot_position, (bot_position[0], bot_position[1] + 1))
-                    new_node = pd.DataFrame(
-                        [{'id': str((bot_position[0], bot_position[1] + 1)),
-                          'color': self.PROCRASTINATED_COLOR_G}]).set_index('id')
-                self.graph_colormap = self.graph_colormap.append(new_node)
-
-            if not got_task:
-                bot.deactivate()
-
-        # Работа со спящими ботами
-
-        waiting_bots = self.get_waiting_bots()
-        for bot in waiting_bots:
-            if len(self.task_list) == 0:
-                break
-            task: Tuple[int, int] = self.task_list.pop(0)
-            bot.activate(task)
-            self.maze.change_block(task, Maze.BOT_BLOCK)
-            self.graph_colormap.loc[str(bot.position), 'color'] = self.BOT_COLOR_G
+        node_color = self.node_color
+        add_edge = self.graph.add_edge
+        explored_color = self.EXPLORED_COLOR_G
+        bot_color = self.BOT_COLOR_G
+        procrastinated_color = self.PROCRASTINATED_COLOR_G
+
+        event_num, self.task_head, self.task_tail = step_kernel(
+            self.maze.flat_matrix, self.maze.width, self.bots.positions, self.bots.status,
+            ExploreManager.DIRECTIONS, self._events,
+            self.task_arr, self.task_head, self.task_tail,
+            Maze.UNEXPLORED_BLOCK, Maze.PROCRASTINATED_BLOCK, Maze.EXPLORED_BLOCK, Maze.BOT_BLOCK,
+            Bot.ACTIVE_STATUS, Bot.WAITING_STATUS)
+
+        if event_num > 0:
+            cells = self._events[:event_num, 2:4]
+            self.maze.mark_dirty(int(cells[:, 0].min()), int(cells[:, 0].max()) + 1,
+                                 int(cells[:, 1].min()), int(cells[:, 1].max()) + 1)
+
+        explored_num = 0
+        for by, bx, cy, cx, event in self._events[:event_num].tolist():
+            cell = (cy, cx)
+            if event == EVENT_EXPLORED:
+                node_color[cell] = explored_color
+                explored_num += 1
+            elif event == EVENT_WOKEN:
+                node_color[cell] = bot_color
+            else:
+                add_edge((by, bx), cell)
+                node_color[cell] = bot_color if event == EVENT_MOVE else procrastinated_color
+                self._layout_stale = True
+        self.maze.register_explored(explored_num)
 
         self.step += 1
 
@@ -292,30 +323,57 @@ class ExploreManager(object):
         progress : float
             Текущий прогресс
         """
-        not_wall_num = np.sum(self.maze.matrix != Maze.WALL_BLOCK)
-        explored_num = np.sum(self.maze.matrix == Maze.EXPLORED_BLOCK)
-        return explored_num / not_wall_num
+        return self.maze.explored_count / self.maze.not_wall_count
 
-    def on_step_click(self, win: MainWindow):
+    def _step_no_render(self) -> bool:
         """
-        Метод, вызывающийся при нажатии на кнопку "Шаг"
+        Метод, выполняющий 1 шаг исследования без отрисовки
+
+        Returns
+        -------
+        done : bool
+            True, если шаг был выполнен
+        """
+        if not self.ready:
+            warn('Входные параметры не заданны, выполнение невозможно')
+            return False
+        if self.get_progress() == 1:
+            warn('Лабиринт пройден')
+            return False
+        self.exploring_step()
+        return True
+
+    def _run_steps(self, win: MainWindow, step_number: int):
+        """
+        Метод, выполняющий несколько шагов исследования с одной отрисовкой в конце
 
         Parameters
         ----------
         win : MainWindow
             Обьект главного окна
+        step_number : int
+            Количество шагов
         """
-        sleep(0.1)
-        if not self.ready:
-            warn('Входные параметры не заданны, выполнение невозможно')
-        elif self.get_progress() == 1:
-            warn('Лабиринт пройден')
-        else:
-            self.exploring_step()
+        done_number = 0
+        while done_number < step_number and self._step_no_render():
+            done_number += 1
+        if done_number > 0:
             win.update_step(self.step)
             win.update_progress(self.get_progress())
             self.show_matrix()
 
+    def on_step_click(self, win: MainWindow):
+        """
+        Метод, вызывающийся при нажатии на кнопку "Шаг"
+
+        Parameters
+        ----------
+        win : MainWindow
+            Обьект главного окна
+        """
+        sleep(0.1)
+        self._run_steps(win, 1)
+
     def on_reset_click(self, win: MainWindow):
         """
         Метод, вызывающийся при нажатии на кнопку "Сброс"
@@ -345,14 +403,9 @@ class ExploreManager(object):
             return
         f = filedialog.asksaveasfile(mode='w', defaultextension=".txt")
         if f is not None:
-            save_matrix = self.maze.matrix
-            for h_idx in range(self.maze.height):
-                for w_idx in range(self.maze.width):
-                    save_matrix[h_idx, w_idx] = Maze.WALL_BLOCK \
-                        if self.maze.matrix[h_idx, w_idx] == Maze.WALL_BLOCK \
-                        else Maze.UNEXPLORED_BLOCK
+            save_matrix = np.where(self.maze.matrix == Maze.WALL_BLOCK, Maze.WALL_BLOCK, Maze.UNEXPLORED_BLOCK)
             # noinspection PyTypeChecker
-            np.savetxt(f, save_matrix)
+            np.savetxt(f, save_matrix, fmt='%d')
             f.close()
 
     def on_step20_click(self, win):
@@ -365,8 +418,7 @@ class ExploreManager(object):
             Обьект главного окна
         """
         sleep(0.1)
-        for i in range(20):
-            self.on_step_click(win)
+        self._run_steps(win, 20)
 
     def on_step10_click(self, win):
         """
@@ -378,8 +430,7 @@ class ExploreManager(object):
             Обьект главного окна
         """
         sleep(0.1)
-        for i in range(10):
-            self.on_step_click(win)
+        self._run_steps(win, 10)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,123 @@
+import numpy as np
+
+from utils import njit
+
+
+def generate(height: int, width: int, seed: int, wall_block: int, unexplored_block: int) -> np.ndarray:
+    """
+    Генерация матрицы лабиринта обходом в глубину
+
+    Parameters
+    ----------
+    height : int
+        Высота матрицы, нечетная
+    width : int
+        Ширина матрицы, нечетная
+    seed : int
+        Зерно генератора случайных чисел
+    wall_block : int
+        Тип блока стены
+    unexplored_block : int
+        Тип неисследованного блока
+
+    Returns
+    -------
+    matrix : np.ndarray
+        Матрица лабиринта типа int8
+
+    References
+    ----------
+    https://habr.com/ru/post/262345/
+    """
+
+    # Случайные числа берутся из локального генератора, чтобы не менять глобальное состояние numpy.
+    # На каждую новую ячейку карты посещений расходуется одно число
+
+    random_values = np.random.default_rng(seed).random((height // 2) * (width // 2))
+    return _generate(height, width, random_values, wall_block, unexplored_block)
+
+
+@njit(cache=True)
+def _generate(height: int, width: int, random_values: np.ndarray, wall_block: int,
+              unexplored_block: int) -> np.ndarray:
+    """
+    Ядро генерации матрицы лабиринта
+
+    Parameters
+    ----------
+    height : int
+        Высота матрицы, нечетная
+    width : int
+        Ширина матрицы, нечетная
+    random_values : np.ndarray
+        Случайные числа из [0, 1) для выбора соседних ячеек, не меньше (height // 2) * (width // 2)
+    wall_block : int
+        Тип блока стены
+    unexplored_block : int
+        Тип неисследованного блока
+
+    Returns
+    -------
+    matrix : np.ndarray
+        Матрица лабиринта типа int8
+    """
+    # Генерация начального темплейта
+
+    matrix = np.full((height, width), wall_block, dtype=np.int8)
+    matrix[1::2, 1::2] = unexplored_block
+
+    # Создание коридоров в начальном темплейте.
+    # Ячейка (cy, cx) карты посещений соответствует клетке (2 * cy + 1, 2 * cx + 1) лабиринта
+
+    rows = height // 2
+    columns = width // 2
+    visited = np.zeros((rows, columns), dtype=np.bool_)
+    cy = 0
+    cx = 0
+    visited[cy, cx] = True
+    visited_count = 1
+
+    # Стек пройденных ячеек, ячейка (cy, cx) хранится как cy * columns + cx
+
+    history = np.empty(rows * columns, dtype=np.int32)
+    history_top = 0
+    neighbours = np.empty((4, 2), dtype=np.int32)
+    while visited_count < rows * columns:
+        neighbour_num = 0
+
+        if cy != 0 and not visited[cy - 1, cx]:
+            neighbours[neighbour_num, 0] = cy - 1
+            neighbours[neighbour_num, 1] = cx
+            neighbour_num += 1
+        if cy != rows - 1 and not visited[cy + 1, cx]:
+            neighbours[neighbour_num, 0] = cy + 1
+            neighbours[neighbour_num, 1] = cx
+            neighbour_num += 1
+        if cx != 0 and not visited[cy, cx - 1]:
+            neighbours[neighbour_num, 0] = cy
+            neighbours[neighbour_num, 1] = cx - 1
+            neighbour_num += 1
+        if cx != columns - 1 and not visited[cy, cx + 1]:
+            neighbours[neighbour_num, 0] = cy
+            neighbours[neighbour_num, 1] = cx + 1
+            neighbour_num += 1
+
+        if neighbour_num == 0:
+            history_top -= 1
+            cy = history[history_top] // columns
+            cx = history[history_top] % columns
+        else:
+            history[history_top] = cy * columns + cx
+            history_top += 1
+            next_idx = int(random_values[visited_count] * neighbour_num)
+            ny = neighbours[next_idx, 0]
+            nx = neighbours[next_idx, 1]
+
+            matrix[cy + ny + 1, cx + nx + 1] = unexplored_block
+
+            cy = ny
+            cx = nx
+            visited[cy, cx] = True
+            visited_count += 1
+
+    return matrix
@@ -1,10 +1,12 @@
-from random import choice
+from random import randrange
 from typing import Optional, Tuple
 from warnings import warn
 
 import matplotlib.pyplot as plt
 import numpy as np
 
+from ._gen import generate
+
 
 class Maze(object):
     WALL_BLOCK = -1
@@ -15,6 +17,9 @@ class Maze(object):
 
     def __init__(self):
         self.__matrix: Optional[np.ndarray] = None
+        self.__not_wall_count: int = 0
+        self.__explored_count: int = 0
+        self.__dirty: Optional[Tuple[int, int, int, int]] = None
 
     @property
     def matrix(self) -> np.ndarray:
@@ -28,6 +33,18 @@ class Maze(object):
         """
         return self.__matrix
 
+    @property
+    def flat_matrix(self) -> np.ndarray:
+        """
+        Геттер для матрицы, развернутой в одномерный массив
+
+        Returns
+        -------
+        flat_matrix : np.ndarray
+            Одномерное представление матрицы лабиринта, использует те же данные
+        """
+        return self.__matrix.reshape(-1)
+
     @property
     def height(self) -> int:
         """
@@ -52,6 +69,42 @@ class Maze(object):
         """
         return self.__matrix.shape[1]
 
+    @property
+    def not_wall_count(self) -> int:
+        """
+        Геттер для количества клеток, не являющихся стенами
+
+        Returns
+        -------
+        not_wall_count : int
+            Количество клеток, не являющихся стенами
+        """
+        return self.__not_wall_count
+
+    @property
+    def explored_count(self) -> int:
+        """
+        Геттер для количества исследованных клеток
+
+        Returns
+        -------
+        explored_count : int
+            Количество исследованных клеток
+        """
+        return self.__explored_count
+
+    @property
+    def dirty_region(self) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Геттер для области матрицы, измененной после последнего вызова clear_dirty
+
+        Returns
+        -------
+        dirty_region : tuple of int or None
+            Границы области (y_start, y_stop, x_start, x_stop), None если изменений не было
+        """
+        return self.__dirty
+
     def set_matrix_randomly(self, height: int = 25, width: int = 25) -> None:
         """
         Рандомная генерация матрицы
@@ -87,44 +140,10 @@ class Maze(object):
                  'Значение будет увеличено на 1')
             width += 1
 
-        # Генерация начального темплейта
-
-        self.__matrix = np.zeros((height, width))
-        for height_idx in range(height):
-            for width_idx in range(width):
-                if (height_idx % 2 != 0) and (width_idx % 2 != 0):
-                    self.__matrix[height_idx, width_idx] = Maze.UNEXPLORED_BLOCK
-                else:
-                    self.__matrix[height_idx, width_idx] = Maze.WALL_BLOCK
-
-        # Создание коридоров в начальном темплейте
-
-        current_point = (1, 1)
-        visit_set = set()
-        history_list = []
-        while len(visit_set) < (width // 2) * (height // 2):
-            visit_set.add(current_point)
-            neighbours = []
-
-            if current_point[0] != 1 and (current_point[0] - 2, current_point[1]) not in visit_set:
-                neighbours.append((current_point[0] - 2, current_point[1]))
-            if current_point[0] != height - 2 and (current_point[0] + 2, current_point[1]) not in visit_set:
-                neighbours.append((current_point[0] + 2, current_point[1]))
-            if current_point[1] != 1 and (current_point[0], current_point[1] - 2) not in visit_set:
-                neighbours.append((current_point[0], current_point[1] - 2))
-            if current_point[1] != width - 2 and (current_point[0], current_point[1] + 2) not in visit_set:
-                neighbours.append((current_point[0], current_point[1] + 2))
-
-            if len(neighbours) == 0:
-                current_point = history_list.pop()
-            else:
-                history_list.append(current_point)
-                next_point = choice(neighbours)
-
-                self.__matrix[(current_point[0] + next_point[0]) // 2,
-                              (current_point[1] + next_point[1]) // 2] = Maze.UNEXPLORED_BLOCK
-
-                current_point = next_point
+        # Генерация лабиринта, зерно берется из модуля random
+
+        self.__matrix = generate(height, width, randrange(2 ** 31), Maze.WALL_BLOCK, Maze.UNEXPLORED_BLOCK)
+        self.__on_matrix_set()
 
     def set_matrix_manually(self, matrix: np.ndarray) -> None:
         """
@@ -133,9 +152,17 @@ class Maze(object):
         Parameters
         ----------
         matrix : np.ndarray
-            Матрица лабиринта
+            Матрица лабиринта, копируется в непрерывный массив int8, исходный массив не изменяется.
+            Если по краю матрицы есть не стены, матрица дополняется рамкой из стен
         """
+        matrix = np.array(matrix, dtype=np.int8, order='C')
+        if (np.any(matrix[0] != Maze.WALL_BLOCK) or np.any(matrix[-1] != Maze.WALL_BLOCK) or
+                np.any(matrix[:, 0] != Maze.WALL_BLOCK) or np.any(matrix[:, -1] != Maze.WALL_BLOCK)):
+            warn('Лабиринт не окружен стенами. '
+                 'Матрица будет дополнена рамкой из стен')
+            matrix = np.pad(matrix, 1, constant_values=Maze.WALL_BLOCK)
         self.__matrix = matrix
+        self.__on_matrix_set()
 
     def change_block(self, coordinates: Tuple[int, int], new_block: int) -> None:
         """
@@ -148,15 +175,69 @@ class Maze(object):
         new_block : int
             Новый статус блока
         """
+        old_block = self.__matrix[coordinates]
         self.__matrix[coordinates] = new_block
+        if old_block == Maze.EXPLORED_BLOCK:
+            self.__explored_count -= 1
+        if new_block == Maze.EXPLORED_BLOCK:
+            self.__explored_count += 1
+
+        height_idx, width_idx = coordinates
+        self.mark_dirty(height_idx, height_idx + 1, width_idx, width_idx + 1)
+
+    def mark_dirty(self, y_start: int, y_stop: int, x_start: int, x_stop: int) -> None:
+        """
+        Метод для расширения измененной области матрицы
+
+        Parameters
+        ----------
+        y_start, y_stop : int
+            Границы измененной области по вертикали (y_stop не включается)
+        x_start, x_stop : int
+            Границы измененной области по горизонтали (x_stop не включается)
+        """
+        if self.__dirty is not None:
+            y_start = min(y_start, self.__dirty[0])
+            y_stop = max(y_stop, self.__dirty[1])
+            x_start = min(x_start, self.__dirty[2])
+            x_stop = max(x_stop, self.__dirty[3])
+        self.__dirty = (y_start, y_stop, x_start, x_stop)
+
+    def clear_dirty(self) -> None:
+        """
+        Метод для сброса измененной области матрицы
+        """
+        self.__dirty = None
+
+    def register_explored(self, number: int) -> None:
+        """
+        Метод для учета клеток, помеченных исследованными напрямую в матрице, минуя change_block
+
+        Parameters
+        ----------
+        number : int
+            Количество клеток, ставших исследованными
+        """
+        self.__explored_count += number
 
     def reset(self):
         if self.__matrix is not None:
-            for height_idx in range(self.height):
-                for width_idx in range(self.width):
-                    if self.matrix[height_idx, width_idx] != -1:
-                        self.matrix[height_idx, width_idx] = 0
+            matrix = self.__matrix
+            matrix[matrix != Maze.WALL_BLOCK] = Maze.UNEXPLORED_BLOCK
+            self.__explored_count = 0
+            self.mark_dirty(0, self.height, 0, self.width)
+
+    def __on_matrix_set(self) -> None:
+        """
+        Метод для подсчета клеток и сброса измененной области после установки новой матрицы
+        """
+        self.__not_wall_count = int(np.count_nonzero(self.__matrix != Maze.WALL_BLOCK))
+        self.__explored_count = int(np.count_nonzero(self.__matrix == Maze.EXPLORED_BLOCK))
+        self.__dirty = (0, self.height, 0, self.width)
+
 
+# Модуль использует относительный импорт генератора, поэтому пример запускается
+# из корня репозитория как модуль пакета: python -m maze.models
 
 if __name__ == '__main__':
     mz = Maze()
@@ -169,11 +250,12 @@ if __name__ == '__main__':
 
     # Ручная установка матрицы
 
-    mz.set_matrix_manually(np.array([[0, 0, 0, 0, 0],
-                                     [0, 1, 0, 1, 0],
-                                     [0, 1, 1, 1, 0],
-                                     [0, 1, 0, 1, 0],
-                                     [0, 0, 0, 0, 0]
+    wall = Maze.WALL_BLOCK
+    mz.set_matrix_manually(np.array([[wall, wall, wall, wall, wall],
+                                     [wall, 0, wall, 0, wall],
+                                     [wall, 0, 0, 0, wall],
+                                     [wall, 0, wall, 0, wall],
+                                     [wall, wall, wall, wall, wall]
                                      ]))
     plt.imshow(mz.matrix)
     plt.show()
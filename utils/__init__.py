@@ -0,0 +1 @@
+from .jit import njit
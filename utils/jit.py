@@ -0,0 +1,11 @@
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """
+        Заглушка для запуска без numba: функция остается интерпретируемой
+        """
+        def decorator(func):
+            return func
+
+        return decorator